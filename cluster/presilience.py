@@ -23,10 +23,313 @@ import networkx as nx
 import numpy as np
 import warnings
 import community
+import multiprocessing
+import scipy.sparse as sp
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from math import log, log2
+from numba import njit, prange, set_num_threads
+
+INV_LN2 = 1.0 / log(2.0)
+
+
+@dataclass(eq=False)
+class PPIGraph:
+    """
+    A flat representation of an undirected (protein-protein interaction)
+    network: a symmetric CSR adjacency over integer node ids 0, ..., N-1,
+    alongside each node's gene expression value and original label. This
+    is what the resilience calculations run on, and it can grow by
+    add_node without going through NetworkX.
+
+    Attributes
+    ----------
+    indptr (np.ndarray):
+        int32 array of length N+1; the neighbors of node i are
+        indices[indptr[i]:indptr[i+1]].
+
+    indices (np.ndarray):
+        int32 array of neighbor ids, with each edge stored in both rows.
+
+    gene_expr (np.ndarray):
+        float64 array of length N, nan for nodes without gene expression.
+
+    names (list):
+        the node label corresponding to each integer id.
+
+    """
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    gene_expr: np.ndarray
+    names: list
+
+    @classmethod
+    def from_networkx(cls, G):
+        """Build a PPIGraph from G, keeping its 'gene_expression' values."""
+        # connectivity only; edge attributes (e.g. 'weight') are not read
+        A = nx.to_scipy_sparse_array(G, weight=None, dtype=np.int8,
+                                     format='csr')
+        gex_dict = nx.get_node_attributes(G, 'gene_expression')
+        gene_expr = np.array([gex_dict.get(i, np.nan) for i in G],
+                             dtype=np.float64)
+
+        return cls(A.indptr.astype(np.int32), A.indices.astype(np.int32),
+                   gene_expr, list(G))
+
+    def to_networkx(self, G=None):
+        """
+        Rebuild an nx.Graph with the original labels and 'gene_expression'
+        values. If G, the graph this PPIGraph was built from, is given, the
+        result is a copy of G (keeping all of its node, edge, and graph
+        attributes) with only the nodes added since then appended.
+
+        """
+
+        if G is None:
+            H = nx.Graph()
+            n_old = 0
+
+        else:
+            n_old = G.number_of_nodes()
+            if self.names[:n_old] != list(G):
+                raise ValueError("G is not the graph this PPIGraph was "
+                                 "built from.")
+            H = G.copy()
+
+        H.add_nodes_from(self.names[n_old:])
+        rows = np.repeat(np.arange(self.number_of_nodes()),
+                         np.diff(self.indptr))
+        H.add_edges_from((self.names[i], self.names[j])
+                         for i, j in zip(rows, self.indices)
+                         if i <= j and j >= n_old)
+
+        gene_exp_dict = {self.names[i]: self.gene_expr[i]
+                         for i in range(n_old, self.number_of_nodes())
+                         if not np.isnan(self.gene_expr[i])}
+        nx.set_node_attributes(H, gene_exp_dict, 'gene_expression')
+
+        return H
+
+    def number_of_nodes(self):
+        return self.indptr.shape[0] - 1
+
+    def degree(self):
+        # as in networkx, a self-loop adds two to its node's degree
+        N = self.number_of_nodes()
+        rows = np.repeat(np.arange(N), np.diff(self.indptr))
+        loops = rows[self.indices == rows]
+
+        return np.diff(self.indptr) + np.bincount(loops, minlength=N)
+
+    def add_node(self, name, eijs, gene_expr=np.nan):
+        """
+        Append a node, name, connected to the node ids in eijs, by adding a
+        row and column to the adjacency. Modifies and returns self.
+
+        """
+
+        if name in self.names:
+            raise ValueError("Node %r is already in the graph." % (name,))
+
+        N = self.number_of_nodes()
+        m = len(eijs)
+        A = sp.csr_array((np.ones(len(self.indices)), self.indices,
+                          self.indptr), shape=(N, N))
+        e_new = sp.coo_array((np.ones(m), (np.asarray(eijs), np.zeros(m))),
+                             shape=(N, 1))
+        A = sp.bmat([[A, e_new], [e_new.T, None]], format='csr')
+
+        self.indptr = A.indptr.astype(np.int32)
+        self.indices = A.indices.astype(np.int32)
+        self.gene_expr = np.append(self.gene_expr, gene_expr)
+        self.names.append(name)
+
+        return self
+
+
+@njit(cache=True, fastmath=True)
+def _cc_csr(indptr, indices, keep_mask):
+    """
+    Connected components of the subgraph induced by the nodes in keep_mask,
+    found by union-find over the kept edges of a CSR adjacency.
+
+    Returns
+    -------
+    labels (np.ndarray):
+        the root node of each kept node's component, or -1 if removed.
+
+    """
+
+    N = keep_mask.shape[0]
+    parent = np.arange(N)
+    for i in range(N):
+        if not keep_mask[i]:
+            continue
+        for k in range(indptr[i], indptr[i + 1]):
+            j = indices[k]
+            if not keep_mask[j]:
+                continue
+            # find both roots, halving the paths along the way
+            ri = i
+            while parent[ri] != ri:
+                parent[ri] = parent[parent[ri]]
+                ri = parent[ri]
+            rj = j
+            while parent[rj] != rj:
+                parent[rj] = parent[parent[rj]]
+                rj = parent[rj]
+            if ri != rj:
+                parent[rj] = ri
+
+    labels = np.full(N, -1)
+    for i in range(N):
+        if keep_mask[i]:
+            ri = i
+            while parent[ri] != ri:
+                ri = parent[ri]
+            labels[i] = ri
+
+    return labels
+
+
+def _plogp_table(N):
+    """
+    Lookup table of p*log2(p) for every component size k = 0, ..., N of a
+    graph with N nodes, where p = k/N and the k = 0 entry is 0.
+
+    """
+
+    # (k/N)*log2(k/N) = k*(ln k - ln N)/N / ln 2, with a single log ufunc
+    k = np.arange(1, N + 1)
+    plogp = np.zeros(N + 1)
+    plogp[1:] = k * (np.log(k) - log(N)) / N * INV_LN2
+
+    return plogp
+
+
+@njit(cache=True, fastmath=True)
+def _entropy_from_labels(labels, n_removed, plogp, leading_term):
+    """
+    The modified Shannon entropy of one sample, given the component labels
+    from _cc_csr, the number of removed nodes (each its own isolate), the
+    p*log2(p) table from _plogp_table, and leading_term = -1/log2(N).
+
+    """
+
+    N = labels.shape[0]
+    sizes = np.zeros(N, dtype=np.int64)
+    for i in range(N):
+        if labels[i] >= 0:
+            sizes[labels[i]] += 1
+
+    curr = n_removed * plogp[1] + plogp[sizes].sum()
+
+    return abs(leading_term * curr)
+
+
+@njit(cache=True, parallel=True)
+def _masked_entropies(indptr, indices, keep, plogp):
+    """
+    The modified Shannon entropy of each row of keep, a (niter, N) boolean
+    matrix of the nodes that survive each independent removal sample.
+
+    """
+
+    niter, N = keep.shape
+    leading_term = -1 / log2(N)
+    H_msh = np.empty(niter)
+    for s in prange(niter):
+        labels = _cc_csr(indptr, indices, keep[s])
+        n_removed = N - np.count_nonzero(keep[s])
+        H_msh[s] = _entropy_from_labels(labels, n_removed, plogp,
+                                        leading_term)
+
+    return H_msh
+
+
+def _entropy_sweep(indptr, indices, plogp, fs, ntimes, niter, H_std, rng):
+    """
+    Mean (and standard deviation of the) modified Shannon entropy of ntimes
+    replicates at each fraction in fs. Every replicate's niter samples for a
+    given f are drawn as one batch from rng.
+
+    Returns
+    -------
+    H_out_mean, H_out_stdv (np.ndarray):
+        arrays of shape (ntimes, len(fs)).
+
+    """
+
+    N = indptr.shape[0] - 1
+    H_out_mean = np.zeros((ntimes, len(fs)))
+    H_out_stdv = np.zeros((ntimes, len(fs)))
+    for f_i, f in enumerate(fs):
+        # nothing is sampled at the endpoints: with f=0 every sample is the
+        # intact graph, and with f=1 every node is an isolate (H_msh=1)
+        if f == 0:
+            keep = np.ones((1, N), dtype=np.bool_)
+            H_out_mean[:, f_i] = _masked_entropies(indptr, indices, keep,
+                                                   plogp)[0]
+            continue
+
+        if f == 1:
+            H_out_mean[:, f_i] = 1.0
+            continue
+
+        # float32 draws are plenty for a comparison against f
+        draws = rng.random((ntimes * niter, N), dtype=np.float32)
+        keep = draws >= np.float32(f)
+        H_msh = _masked_entropies(indptr, indices, keep, plogp)
+        H_msh = H_msh.reshape(ntimes, niter)
+        H_out_mean[:, f_i] = H_msh.mean(axis=1)
+        if H_std:
+            H_out_stdv[:, f_i] = H_msh.std(axis=1)
+
+    return H_out_mean, H_out_stdv
+
+
+def _one_replicate(indptr, indices, plogp, fs, niter, H_std, seed):
+    """
+    A single replicate of _entropy_sweep with its own seeded Generator, so
+    that it can be run in a worker process.
+
+    """
+
+    # the processes are the parallelism here; one Numba thread per worker
+    # avoids running n_jobs x cores threads
+    set_num_threads(1)
+
+    H_out_mean, H_out_stdv = _entropy_sweep(indptr, indices, plogp, fs, 1,
+                                            niter, H_std,
+                                            np.random.default_rng(seed))
+
+    return H_out_mean[0], H_out_stdv[0]
+
+
+def _gumbel_top_m(weights, m, rng):
+    """
+    Positions of m items drawn without replacement with probability
+    proportional to weights, using the Gumbel-top-m trick: perturb the log
+    weights with Gumbel noise and keep the m largest.
+
+    """
+
+    if not (np.all(np.isfinite(weights)) and np.all(weights >= 0)):
+        raise ValueError("Weights must be finite and non-negative.")
+
+    if np.count_nonzero(weights) < m:
+        raise ValueError("Fewer non-zero weights than m.")
+
+    with np.errstate(divide='ignore'):
+        keys = np.log(weights) + rng.gumbel(size=weights.shape[0])
+
+    return np.argpartition(-keys, m - 1)[:m]
 
 
 def modified_shannon_entropy(G, f, removal='random',
-                             niter=50, return_stdv=False):
+                             niter=50, return_stdv=False, rng=None):
     """
     After a fraction, f, nodes have been 'removed' from the network (i.e., they
     have become disconnected isolates, such that the number of nodes does not
@@ -37,7 +340,7 @@ def modified_shannon_entropy(G, f, removal='random',
 
     Parameters
     ----------
-    G (nx.Graph):
+    G (nx.Graph or PPIGraph):
         the graph in question.
 
     f (float):
@@ -54,6 +357,10 @@ def modified_shannon_entropy(G, f, removal='random',
         deviation of the entropy after running ntimes. if False, this function
         just returns the mean value for the entropy.
 
+    rng (np.random.Generator):
+        the random number generator to draw from. if None, a new one is
+        created with np.random.default_rng().
+
     Returns
     -------
     H_msh_mean (float):
@@ -62,49 +369,29 @@ def modified_shannon_entropy(G, f, removal='random',
 
     """
 
-    H_msh_mean = []
-    for _ in range(niter):
-        out_H = []
-        N = G.number_of_nodes()
-        leading_term = -1 / np.log2(N)
-        p_i_unif = 1 / N
-
-        G_f = G.copy()
-
-        if removal == 'random':
-            remove_nodes = [i for i in G_f.nodes() if np.random.rand() < f]
-
-        else:
-            warnings.warn("Only implemented for *random*. switching to that.")
-            remove_nodes = [i for i in G_f.nodes() if np.random.rand() < f]
+    if removal != 'random':
+        warnings.warn("Only implemented for *random*. switching to that.")
 
-        curr = 0
+    if not isinstance(G, PPIGraph):
+        G = PPIGraph.from_networkx(G)
 
-        if len(remove_nodes):
-            for node_r in remove_nodes:
-                G_f.remove_node(node_r)
-                curr += p_i_unif * np.log2(p_i_unif)
+    if rng is None:
+        rng = np.random.default_rng()
 
-        Cs = list(nx.connected_components(G_f))
-        for Ci in Cs:
-            p_i = len(Ci) / N
-            curr += p_i * np.log2(p_i)
-
-        out_H.append(curr)
-
-        H_msh = np.abs(leading_term * np.sum(out_H))
-        H_msh_mean.append(H_msh)
+    N = G.number_of_nodes()
+    keep = rng.random((niter, N), dtype=np.float32) >= np.float32(f)
+    H_msh = _masked_entropies(G.indptr, G.indices, keep, _plogp_table(N))
 
     if return_stdv and niter > 4:
 
-        return np.array(H_msh_mean).mean(), np.array(H_msh_mean).std()
+        return H_msh.mean(), H_msh.std()
 
     else:
-        return np.array(H_msh_mean).mean()
+        return H_msh.mean()
 
 
 def resilience(G, ntimes=2, rate=51, output_list=True, removal='random',
-               H_std=True, niter=50):
+               H_std=True, niter=50, n_jobs=1, rng=None):
     """
     The resilience of a network, G, is defined as the Shannon
     entropy of the cluster size distribution of a graph at a given
@@ -114,7 +401,7 @@ def resilience(G, ntimes=2, rate=51, output_list=True, removal='random',
 
     Parameters
     ----------
-    G (nx.Graph):
+    G (nx.Graph or PPIGraph):
         the graph in question.
 
     n_times (int):
@@ -133,6 +420,19 @@ def resilience(G, ntimes=2, rate=51, output_list=True, removal='random',
         can imagine a number of ways to systematically bias the node-removal
         process (e.g. based preferentially on degree, etc.)
 
+    n_jobs (int):
+        the number of worker processes that the ntimes replicates are split
+        across. if 1, the replicates are run in this process, where the
+        samples are already spread over all cores by Numba; each worker
+        uses a single thread instead. spawning workers costs seconds, so
+        n_jobs > 1 only pays off when each replicate takes much longer
+        than that. workers are spawned, so scripts using n_jobs > 1 need
+        an `if __name__ == '__main__':` guard.
+
+    rng (np.random.Generator):
+        the random number generator to draw from. if None, a new one is
+        created with np.random.default_rng().
+
     Returns
     -------
     out_mean (list or float):
@@ -142,23 +442,42 @@ def resilience(G, ntimes=2, rate=51, output_list=True, removal='random',
 
     """
 
-    out_mean = []
-    out_stdv = []
-    for _ in range(ntimes):
-        H_out_mean = []
-        H_out_stdv = []
-        for f in np.linspace(0, 1, rate):
-            H_msh_mean, H_msh_stdv = modified_shannon_entropy(G, f, removal,
-                                                              niter, H_std)
-            H_out_mean.append(H_msh_mean)
-            H_out_stdv.append(H_msh_stdv)
-            # H_out.append(modified_shannon_entropy(G, f, removal))
+    if removal != 'random':
+        warnings.warn("Only implemented for *random*. switching to that.")
+
+    if not isinstance(G, PPIGraph):
+        G = PPIGraph.from_networkx(G)
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    indptr = G.indptr
+    indices = G.indices
+    plogp = _plogp_table(G.number_of_nodes())
+    fs = np.linspace(0, 1, rate)
 
-        out_mean.append(np.array(H_out_mean))
-        out_stdv.append(np.array(H_out_stdv))
+    if n_jobs > 1:
+        # replicates are independent; the workers only need the CSR arrays
+        seeds = rng.integers(2**32, size=ntimes)
+        # spawn rather than fork: Numba's thread pool is not fork-safe
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(n_jobs, ntimes),
+                                 mp_context=ctx) as ex:
+            results = list(ex.map(_one_replicate, repeat(indptr, ntimes),
+                                  repeat(indices, ntimes),
+                                  repeat(plogp, ntimes), repeat(fs, ntimes),
+                                  repeat(niter, ntimes), repeat(H_std, ntimes),
+                                  seeds))
 
-    out_mean = np.array(out_mean).mean(axis=0)
-    out_stdv = np.array(out_stdv).mean(axis=0)
+        out_mean = np.array([H_out_mean for H_out_mean, _ in results])
+        out_stdv = np.array([H_out_stdv for _, H_out_stdv in results])
+
+    else:
+        out_mean, out_stdv = _entropy_sweep(indptr, indices, plogp, fs,
+                                            ntimes, niter, H_std, rng)
+
+    out_mean = out_mean.mean(axis=0)
+    out_stdv = out_stdv.mean(axis=0)
 
     if output_list:
         return out_mean
@@ -167,7 +486,7 @@ def resilience(G, ntimes=2, rate=51, output_list=True, removal='random',
         return 1 - sum(out_mean) / rate
 
 
-def add_node(G, m, n, method='random', alpha=1.0):
+def add_node(G, m, n, method='random', alpha=1.0, rng=None):
     """
     Add node to the network according to the method supplied. This new node may
     be added randomly, preferentially based on degree, or using insights about
@@ -176,7 +495,7 @@ def add_node(G, m, n, method='random', alpha=1.0):
 
     Params
     ------
-    G (nx.Graph):
+    G (nx.Graph or PPIGraph):
         the (protein-protein interaction) network in question.
 
     m (int):
@@ -193,58 +512,95 @@ def add_node(G, m, n, method='random', alpha=1.0):
         exponent, which makes node_i more / less likely to attaching its m
         edges to high-degree nodes.
 
+    rng (np.random.Generator):
+        the random number generator to draw from. if None, a new one is
+        created with np.random.default_rng().
+
     Returns
     -------
-    G (nx.Graph):
+    G (nx.Graph or PPIGraph):
         the graph with nodes added.
 
     """
 
+    if rng is None:
+        rng = np.random.default_rng()
+
+    if isinstance(G, PPIGraph):
+        return _add_node_flat(G, m, n, method, alpha, rng)
+
+    # sample positions rather than labels: rng.choice would coerce a
+    # mix of str and int labels to one dtype (e.g. node 0 becomes '0')
     nodes = list(G.nodes())
     N = len(nodes)
 
     if method == 'random':
         # add random node
-        probs = [1 / N for i in range(N)]
-        eijs = np.random.choice(nodes, size=(m,), replace=False, p=probs)
+        eijs = [nodes[j] for j in rng.choice(N, size=(m,), replace=False)]
 
-        for node_j in eijs:
-            G.add_edge(n, node_j)
+        G.add_edges_from((n, node_j) for node_j in eijs)
 
         return G
 
     if method == 'degree':
         # add preferential attachment based on degree
-        degrees = np.array(list(dict(G.degree()).values()))
-        probs = (degrees**alpha) / sum(degrees**alpha)
-        eijs = np.random.choice(nodes, size=(m,), replace=False, p=probs)
+        degrees = np.fromiter((d for _, d in G.degree()), dtype=np.int64,
+                              count=N)
+        weights = degrees.astype(np.float64)**alpha
+        eijs = [nodes[j] for j in _gumbel_top_m(weights, m, rng)]
 
-        for node_j in eijs:
-            G.add_edge(n, node_j)
+        G.add_edges_from((n, node_j) for node_j in eijs)
 
         return G
 
     if method == 'bio_smart':
         # add node preferentially by the node's gene expression attribute
         gex_dict = nx.get_node_attributes(G, 'gene_expression')
-        gene_expression = np.array(list(gex_dict.values()))
+        gene_expression = np.array([gex_dict.get(i, np.nan) for i in nodes],
+                                   dtype=np.float64)
         gene_exp_decile = np.percentile(gene_expression, 10)
 
-        probs = (gene_expression) / sum(gene_expression)
-        eijs = np.random.choice(nodes, size=(m,), replace=False, p=probs)
+        eijs = [nodes[j] for j in _gumbel_top_m(gene_expression, m, rng)]
 
-        for node_j in eijs:
-            G.add_edge('added_protein_'+str(n), node_j)
+        new_node = 'added_protein_' + str(n)
+        G.add_edges_from((new_node, node_j) for node_j in eijs)
 
         gene_exp_dict = nx.get_node_attributes(G, 'gene_expression')
-        gene_exp_dict['added_protein_'+str(n)] = gene_exp_decile
+        gene_exp_dict[new_node] = gene_exp_decile
         nx.set_node_attributes(G, gene_exp_dict, 'gene_expression')
 
         return G
 
 
+def _add_node_flat(G, m, n, method, alpha, rng):
+    """
+    add_node for a PPIGraph, where nodes are picked by integer id and the
+    degrees and gene expression values are already arrays.
+
+    """
+
+    N = G.number_of_nodes()
+
+    if method == 'random':
+        eijs = rng.choice(N, size=(m,), replace=False)
+
+        return G.add_node(n, eijs)
+
+    if method == 'degree':
+        weights = G.degree().astype(np.float64)**alpha
+        eijs = _gumbel_top_m(weights, m, rng)
+
+        return G.add_node(n, eijs)
+
+    if method == 'bio_smart':
+        gene_exp_decile = np.percentile(G.gene_expr, 10)
+        eijs = _gumbel_top_m(G.gene_expr, m, rng)
+
+        return G.add_node('added_protein_' + str(n), eijs, gene_exp_decile)
+
+
 def presilience(G, t=4, m=2, method='random', rate=100,
-                ntimes=10, output_list=True, printt=True):
+                ntimes=10, output_list=True, printt=True, rng=None):
     """
     The 'presilience' is defined as the change in resilience (as calculated
     in Zitnik et al. (2019) using a modified Shannon entropy of the
@@ -282,6 +638,10 @@ def presilience(G, t=4, m=2, method='random', rate=100,
     output_list (bool):
         if True, returns list of resilience values. else return single number.
 
+    rng (np.random.Generator):
+        the random number generator to draw from. if None, a new one is
+        created with np.random.default_rng().
+
     Returns
     -------
     G (nx.Graph):
@@ -292,24 +652,30 @@ def presilience(G, t=4, m=2, method='random', rate=100,
 
     """
 
-    Gx = G.copy()
-    presilience = [resilience(Gx, ntimes, rate, output_list=False)]
+    if rng is None:
+        rng = np.random.default_rng()
+
+    # grow the flat representation; G itself is left untouched
+    Gx = PPIGraph.from_networkx(G)
+    presilience = [resilience(Gx, ntimes, rate, output_list=False, rng=rng)]
 
     for new_node in range(t):
         if printt:
             print("\t Presilience t =", new_node)
 
-        Gx = add_node(Gx, m, new_node, method)
-        presilience.append(resilience(Gx, ntimes, rate, output_list=False))
+        Gx = add_node(Gx, m, new_node, method, rng=rng)
+        presilience.append(resilience(Gx, ntimes, rate, output_list=False,
+                                      rng=rng))
 
     if output_list:
-        return Gx, presilience
+        return Gx.to_networkx(G), presilience
     else:
-        return Gx, presilience[-1]
+        return Gx.to_networkx(G), presilience[-1]
 
 
 def presilience_mean(G, t=4, m=2, method='random', rate=40,
-                     ntimes=10, output_list=True, n_iter=20, printt=True):
+                     ntimes=10, output_list=True, n_iter=20, printt=True,
+                     rng=None):
     """
     Runs the presilience algorithm several (n_iter) times.
 
@@ -344,6 +710,10 @@ def presilience_mean(G, t=4, m=2, method='random', rate=40,
     n_iter (int):
         number of iterations that go into creating the mean presilience.
 
+    rng (np.random.Generator):
+        the random number generator to draw from. if None, a new one is
+        created with np.random.default_rng().
+
     Returns
     -------
     presilience_mean (np.array):
@@ -351,13 +721,17 @@ def presilience_mean(G, t=4, m=2, method='random', rate=40,
 
     """
 
+    if rng is None:
+        rng = np.random.default_rng()
+
     if output_list:
         pres = []
         for i in range(n_iter):
             if printt:
                 print('Presilience run: %02i' % (i))
 
-            _, pres_i = presilience(G, t, m, method, rate, ntimes, output_list)
+            _, pres_i = presilience(G, t, m, method, rate, ntimes, output_list,
+                                    rng=rng)
             pres.append(pres_i)
 
         pres = np.array(pres)
@@ -369,7 +743,8 @@ def presilience_mean(G, t=4, m=2, method='random', rate=40,
             if printt:
                 print('Presilience run: %02i' % (i))
 
-            _, pres_i = presilience(G, t, m, method, rate, ntimes, output_list)
+            _, pres_i = presilience(G, t, m, method, rate, ntimes, output_list,
+                                    rng=rng)
             pres.append(pres_i)
 
         pres = np.array(pres)
@@ -378,7 +753,8 @@ def presilience_mean(G, t=4, m=2, method='random', rate=40,
     return presilience_mean
 
 
-def modularience(G, t=4, m=2, method='random', output_list=True, printt=True):
+def modularience(G, t=4, m=2, method='random', output_list=True, printt=True,
+                 rng=None):
     """
     The 'modularience' is defined as the change in modularity of the
     community-detected partition following the following the
@@ -407,6 +783,10 @@ def modularience(G, t=4, m=2, method='random', output_list=True, printt=True):
     output_list (bool):
         if True, returns list of resilience values. else return single number.
 
+    rng (np.random.Generator):
+        the random number generator to draw from. if None, a new one is
+        created with np.random.default_rng().
+
     Returns
     -------
     G (nx.Graph):
@@ -417,16 +797,22 @@ def modularience(G, t=4, m=2, method='random', output_list=True, printt=True):
 
     """
 
+    if rng is None:
+        rng = np.random.default_rng()
+
+    # the Louvain partition is seeded from rng too, so rng controls the run
     Gx = G.copy()
-    partition = community.best_partition(Gx)
+    partition = community.best_partition(
+        Gx, random_state=int(rng.integers(2**32)))
     modularit = [community.modularity(partition, Gx)]
 
     for new_node in range(t):
         if printt:
             print("\t Modularience t =", new_node)
 
-        Gx = add_node(Gx, m, str(new_node), method)
-        partition = community.best_partition(Gx)
+        Gx = add_node(Gx, m, str(new_node), method, rng=rng)
+        partition = community.best_partition(
+            Gx, random_state=int(rng.integers(2**32)))
         modularit.append(community.modularity(partition, Gx))
 
     if output_list:
@@ -436,7 +822,7 @@ def modularience(G, t=4, m=2, method='random', output_list=True, printt=True):
 
 
 def modularience_mean(G, t=4, m=2, method='random',
-                      output_list=True, n_iter=20, printt=True):
+                      output_list=True, n_iter=20, printt=True, rng=None):
     """
     Runs the modularience algorithm several (n_iter) times.
 
@@ -460,6 +846,13 @@ def modularience_mean(G, t=4, m=2, method='random',
     output_list (bool):
         if True, returns list of resilience values. else return single number.
 
+    n_iter (int):
+        number of iterations that go into creating the mean modularience.
+
+    rng (np.random.Generator):
+        the random number generator to draw from. if None, a new one is
+        created with np.random.default_rng().
+
     Returns
     -------
     comm_mean (np.array):
@@ -467,13 +860,16 @@ def modularience_mean(G, t=4, m=2, method='random',
 
     """
 
+    if rng is None:
+        rng = np.random.default_rng()
+
     if output_list:
         comm = []
         for i in range(n_iter):
             if printt:
                 print('Modularience run: %02i' % (i))
 
-            _, comm_i = modularience(G, t, m, method, output_list)
+            _, comm_i = modularience(G, t, m, method, output_list, rng=rng)
             comm.append(comm_i)
 
         comm = np.array(comm)
@@ -485,7 +881,7 @@ def modularience_mean(G, t=4, m=2, method='random',
             if printt:
                 print('Modularience run: %02i' % (i))
 
-            _, comm_i = modularience(G, t, m, method, output_list)
+            _, comm_i = modularience(G, t, m, method, output_list, rng=rng)
             comm.append(comm_i)
 
         comm = np.array(comm)
@@ -494,7 +890,7 @@ def modularience_mean(G, t=4, m=2, method='random',
     return comm_mean
 
 
-def gene_expression_shuffle(G, p_permute):
+def gene_expression_shuffle(G, p_permute, rng=None):
     """
     Shuffles p_permute of the gene expression values. Each node in G
     should have a node attribute that corresponds to the gene expression
@@ -511,6 +907,10 @@ def gene_expression_shuffle(G, p_permute):
         the fraction of nodes in the network whose gene expression values
         will be shuffled among one another.
 
+    rng (np.random.Generator):
+        the random number generator to draw from. if None, a new one is
+        created with np.random.default_rng().
+
     Returns
     -------
     H (nx.Graph):
@@ -518,17 +918,22 @@ def gene_expression_shuffle(G, p_permute):
 
     """
 
+    if rng is None:
+        rng = np.random.default_rng()
+
     gene_expression = nx.get_node_attributes(G, 'gene_expression')
 
-    # permute the gene expression values among n nodes
-    n_permute = int(p_permute * G.number_of_nodes())
-    permutate_nodes = np.random.choice(list(G.nodes()), replace=False,
-                                       size=n_permute)
+    # permute the gene expression values among n nodes, sampling positions
+    # so that node labels keep their type
+    nodes = list(G.nodes())
+    n_permute = int(p_permute * len(nodes))
+    permutate_nodes = [nodes[j] for j in
+                       rng.choice(len(nodes), replace=False, size=n_permute)]
 
     gene_expression_values = [gene_expression.get(i) for i in permutate_nodes]
 
     gene_expression_out = gene_expression.copy()
-    np.random.shuffle(gene_expression_values)
+    rng.shuffle(gene_expression_values)
 
     for p_i, perm in enumerate(permutate_nodes):
         gene_expression_out[perm] = gene_expression_values[p_i]
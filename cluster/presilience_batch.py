@@ -31,6 +31,7 @@ seed_num = int(args[5])
 
 # set seed
 random.seed(seed_num)
+rng = np.random.default_rng(seed_num)
 
 timesteps_out = 20
 noise_interval = np.linspace(0, 1, 11).round(3)
@@ -46,7 +47,7 @@ print("Starting at", dt.datetime.now())
 if method_used == 'bio_smart':
     for i in noise_interval:
         if i > 0:
-            H = gene_expression_shuffle(G, i)
+            H = gene_expression_shuffle(G, i, rng=rng)
 
         else:
             H = G.copy()
@@ -54,13 +55,13 @@ if method_used == 'bio_smart':
         pres_h = presilience_mean(H, t=timesteps_out, m=links_per_new,
                                   method=method_used, rate=r,
                                   ntimes=nrep_presi, output_list=True,
-                                  n_iter=iterations)
+                                  n_iter=iterations, rng=rng)
         pres[i] = list(pres_h)
         # pres.append(list(pres_h))
 
         comm_h = modularience_mean(H, t=timesteps_out, m=links_per_new,
                                    method=method_used, output_list=True,
-                                   n_iter=iterations)
+                                   n_iter=iterations, rng=rng)
         comm[i] = list(comm_h)
         # comm.append(list(comm_h))
 
@@ -71,11 +72,11 @@ else:
     pres_h = presilience_mean(H, t=timesteps_out, m=links_per_new,
                               method=method_used, rate=r,
                               ntimes=nrep_presi, output_list=True,
-                              n_iter=iterations)
+                              n_iter=iterations, rng=rng)
 
     comm_h = modularience_mean(H, t=timesteps_out, m=links_per_new,
                                method=method_used, output_list=True,
-                               n_iter=iterations)
+                               n_iter=iterations, rng=rng)
 
     pres[noise_interval[0]] = list(pres_h)
     # pres.append(list(pres_h))